@@ -1,10 +1,15 @@
+import asyncio
 import math
-import time
 from typing import Literal
 
+from psynapse_backend.pure_op_utils import pure
 from psynapse_backend.schema_extractor import AnnotatedDict
 from psynapse_backend.stateful_op_utils import ProgressReporter
 
+# Pre-bound so the hot ops skip the `math` attribute lookup on every call
+_log = math.log
+_exp = math.exp
+
 
 def add(a: float, b: float) -> float:
     """
@@ -80,10 +85,12 @@ def modulo(a: float, b: float) -> float:
     return a % b
 
 
+@pure
 def power(a: float, b: float) -> float:
     return a**b
 
 
+@pure
 def sqrt(a: float) -> float:
     """
     Calculate the square root of a number.
@@ -97,6 +104,7 @@ def sqrt(a: float) -> float:
     return a**0.5
 
 
+@pure
 def log(a: float) -> float:
     """
     Calculate the natural logarithm of a number.
@@ -107,9 +115,10 @@ def log(a: float) -> float:
     Returns:
         The natural logarithm of the number
     """
-    return math.log(a)
+    return _log(a)
 
 
+@pure
 def exp(a: float) -> float:
     """
     Exponentiate a number.
@@ -120,7 +129,7 @@ def exp(a: float) -> float:
     Returns:
         The exponentiated number
     """
-    return math.exp(a)
+    return _exp(a)
 
 
 def greet(name: str, greeting: str = "Hello", punctuation: str = "!") -> str:
@@ -153,9 +162,11 @@ def at_index(object: list | dict, index: int | str) -> any:
     Returns:
         The value at the given index
     """
-    if isinstance(object, list):
+    try:
+        return object[index]
+    except TypeError:
+        # List indices wired from text inputs arrive as strings
         return object[int(index)]
-    return object[index]
 
 
 def split_name(full_name: str) -> AnnotatedDict[Literal["first", "last"]]:
@@ -196,9 +207,10 @@ def divmod_numbers(
     """
     if b == 0:
         raise ValueError("Division by zero")
+    quotient, remainder = divmod(a, b)
     return {
-        "quotient": a // b,
-        "remainder": a % b,
+        "quotient": quotient,
+        "remainder": remainder,
     }
 
 
@@ -206,7 +218,7 @@ class ProgressOpp:
     def __init__(self):
         self._progress_reporter = ProgressReporter()
 
-    def __call__(self, count: int) -> int:
+    async def __call__(self, count: int) -> int:
         """
         Process items with progress reporting.
 
@@ -218,7 +230,7 @@ class ProgressOpp:
         """
         results = []
         for i in range(count):
-            time.sleep(5)
+            await asyncio.sleep(5)
             results.append(i * 2)
             self._progress_reporter.update(
                 i + 1, count, f"Processing item {i + 1}/{count}"
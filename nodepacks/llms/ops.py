@@ -1,8 +1,163 @@
+import asyncio
+import concurrent.futures
+import copy
+import hashlib
+import importlib.util
+import io
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from functools import lru_cache
 from typing import Any, Literal
 
 from psynapse_backend.stateful_op_utils import StreamReporter
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _get_api_key(api_key_variable: str) -> str:
+    """Read an API key from the environment, raising if it is not set."""
+    api_key = os.getenv(api_key_variable)
+    if not api_key:
+        raise ValueError(
+            f"Environment variable '{api_key_variable}' is not set. "
+            f"Please set it before running this function."
+        )
+    return api_key
+
+
+@lru_cache(maxsize=32)
+def _create_openai_client(base_url: str, api_key: str, max_retries: int | None):
+    """Create an OpenAI client, cached so its connection pool is reused across calls."""
+    import httpx
+    from openai import OpenAI
+
+    # HTTP/2 multiplexes concurrent requests over one connection, but needs `h2`. The
+    # 600s read timeout matches the OpenAI SDK's default, so long completions (e.g. from
+    # reasoning models) are not cut short
+    http_client = httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=100, max_keepalive_connections=20, keepalive_expiry=90.0
+        ),
+        timeout=httpx.Timeout(600.0, connect=10.0),
+    )
+    retry_options = {} if max_retries is None else {"max_retries": max_retries}
+    return OpenAI(
+        base_url=base_url, api_key=api_key, http_client=http_client, **retry_options
+    )
+
+
+def _dumps_json(obj: Any, sort_keys: bool = False) -> bytes:
+    """Serialize `obj` to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(obj, sort_keys=sort_keys, default=str).encode()
+
+
+def _loads_json(data: str | bytes) -> Any:
+    """Deserialize JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _iter_sse_chunks(raw_response):
+    """Decode the JSON payloads of a raw chat completion event stream."""
+    for line in raw_response.iter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        chunk = _loads_json(data)
+        if error := chunk.get("error"):
+            message = error.get("message") if isinstance(error, dict) else error
+            raise RuntimeError(f"OpenAI stream returned an error: {message}")
+        yield chunk
+
+
+def _completion_kwargs(**params: Any) -> dict[str, Any]:
+    """Drop the optional completion parameters that were left unset."""
+    return {key: value for key, value in params.items() if value is not None}
+
+
+@lru_cache(maxsize=None)
+def _async_openai_class():
+    """Import `AsyncOpenAI` once, deferring the cost until a batch node first runs."""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI
+
+
+@lru_cache(maxsize=None)
+def _litellm_completion():
+    """Import litellm's `completion` once, deferring its heavy import until first use."""
+    from litellm import completion
+
+    return completion
+
+
+def _get_openai_client(
+    base_url: str, api_key_variable: str, max_retries: int | None = None
+):
+    """Get the shared OpenAI client for an endpoint and the API key in `api_key_variable`.
+
+    If `max_retries` is given, the returned client retries failed requests (rate
+    limits, timeouts, connection and server errors) that many times, with exponential
+    backoff and jitter that honours `Retry-After`. Otherwise the SDK's default applies.
+    """
+    return _create_openai_client(base_url, _get_api_key(api_key_variable), max_retries)
+
+
+class _LLMCache:
+    """A thread-safe LRU cache of LLM responses with an optional time-to-live."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """Hash a request into a stable cache key."""
+        return hashlib.sha256(_dumps_json(request, sort_keys=True)).hexdigest()
+
+    def get(self, key: str, ttl_seconds: float | None = None) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if ttl_seconds is not None and time.monotonic() - created_at > ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+_chat_completion_cache = _LLMCache()
+
+# Identical deterministic requests that are already in flight, keyed like the cache
+_inflight_requests: dict[str, concurrent.futures.Future] = {}
+_inflight_lock = threading.Lock()
+
 
 def openai_chat_completion(
     model: str,
@@ -17,10 +172,17 @@ def openai_chat_completion(
     seed: int | None = None,
     top_logprobs: int | None = None,
     top_p: float | None = None,
+    cache_enabled: bool = True,
+    cache_ttl_seconds: float | None = None,
+    max_retries: int = 6,
 ) -> dict[str, Any]:
     """
     Make a chat completion request to OpenAI.
 
+    Deterministic requests (`temperature` of 0, or unset with a fixed `seed`) are served
+    from an in-memory cache when the exact same request has been made before, and
+    concurrent identical requests share a single API call.
+
     Args:
         model (str): The OpenAI model to use.
         messages (list[dict[str, str | dict[str, str]]]): The messages to send to the model.
@@ -51,43 +213,298 @@ def openai_chat_completion(
         top_p (float | None): An alternative to sampling with temperature, called nucleus sampling, where the
             model considers the results of the tokens with top_p probability mass. So 0.1
             means only the tokens comprising the top 10% probability mass are considered.
+        cache_enabled (bool): Whether to reuse responses of identical deterministic requests. Defaults to True.
+        cache_ttl_seconds (float | None): How long a cached response stays valid, in seconds. Cached
+            responses never expire if this is None.
+        max_retries (int): How many times to retry rate-limited or failed requests with exponential
+            backoff. Defaults to 6.
     Returns:
         dict[str, Any]: The OpenAI response.
     """
-    from openai import OpenAI
+    client = _get_openai_client(base_url, api_key_variable, max_retries)
 
-    api_key = os.getenv(api_key_variable)
-    if not api_key:
-        raise ValueError(
-            f"Environment variable '{api_key_variable}' is not set. "
-            f"Please set it before running this function."
+    completion_kwargs = _completion_kwargs(
+        max_completion_tokens=max_completion_tokens,
+        max_tokens=max_tokens,
+        reasoning_effort=reasoning_effort,
+        temperature=temperature,
+        seed=seed,
+        top_logprobs=top_logprobs,
+        top_p=top_p,
+    )
+
+    deterministic = temperature in (None, 0) and (seed is not None or temperature == 0)
+
+    def create() -> dict[str, Any]:
+        # Decode the raw response body instead of building an SDK model only to
+        # convert it back into a dict
+        raw_response = client.chat.completions.with_raw_response.create(
+            model=model,
+            messages=messages,
+            logprobs=logprobs,
+            stream=False,
+            **completion_kwargs,
         )
-    client = OpenAI(base_url=base_url, api_key=api_key)
-
-    completion_kwargs = {}
-    if max_completion_tokens:
-        completion_kwargs["max_completion_tokens"] = max_completion_tokens
-    if max_tokens:
-        completion_kwargs["max_tokens"] = max_tokens
-    if reasoning_effort:
-        completion_kwargs["reasoning_effort"] = reasoning_effort
-    if temperature:
-        completion_kwargs["temperature"] = temperature
-    if seed:
-        completion_kwargs["seed"] = seed
-    if top_logprobs:
-        completion_kwargs["top_logprobs"] = top_logprobs
-    if top_p:
-        completion_kwargs["top_p"] = top_p
+        return _loads_json(raw_response.content)
 
-    response = client.chat.completions.create(
+    if not deterministic:
+        return create()
+
+    # Key on the credential as well, so a response is never served to (or shared
+    # in flight with) a caller using a different API key
+    cache_key = _LLMCache.make_key(
+        base_url=base_url,
+        api_key_hash=hashlib.sha256(
+            _get_api_key(api_key_variable).encode()
+        ).hexdigest(),
         model=model,
         messages=messages,
         logprobs=logprobs,
+        kwargs=completion_kwargs,
+    )
+    if cache_enabled:
+        cached_response = _chat_completion_cache.get(cache_key, cache_ttl_seconds)
+        if cached_response is not None:
+            return cached_response
+
+    # Coalesce concurrent identical requests into a single API call
+    with _inflight_lock:
+        future = _inflight_requests.get(cache_key)
+        is_leader = future is None
+        if is_leader:
+            future = concurrent.futures.Future()
+            _inflight_requests[cache_key] = future
+    if not is_leader:
+        return copy.deepcopy(future.result())
+
+    try:
+        response = create()
+        if cache_enabled:
+            _chat_completion_cache.set(cache_key, response)
+        future.set_result(copy.deepcopy(response))
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight_requests[cache_key]
+    return response
+
+
+def openai_chat_completion_text(
+    model: str,
+    messages: list[dict[str, str | dict[str, str]]],
+    base_url: str = "https://api.openai.com/v1",
+    api_key_variable: str = "OPENAI_API_KEY",
+    max_completion_tokens: int | None = None,
+    max_tokens: int | None = None,
+    reasoning_effort: Literal["none", "low", "medium", "high"] | None = None,
+    temperature: float | None = None,
+    seed: int | None = None,
+    top_p: float | None = None,
+    max_retries: int = 6,
+) -> str:
+    """
+    Make a chat completion request to OpenAI and return only the message content.
+
+    This is a faster alternative to chaining `openai_chat_completion` into
+    `get_message_content`, since the content is read straight off the SDK response
+    without converting the whole response to a dict.
+
+    Args:
+        model (str): The OpenAI model to use.
+        messages (list[dict[str, str | dict[str, str]]]): The messages to send to the model.
+        base_url (str, optional): The base URL for the OpenAI API. Defaults to "https://api.openai.com/v1".
+        api_key_variable (str, optional): The environment variable containing the API key. Defaults to "OPENAI_API_KEY".
+        max_completion_tokens (int | None): An upper bound for the number of tokens that can be generated for a completion.
+        max_tokens (int | None): The maximum number of tokens that can be generated in the chat completion.
+        reasoning_effort (Literal["none", "low", "medium", "high"] | None): Constrains effort on reasoning for reasoning models.
+        temperature (float | None): What sampling temperature to use, between 0 and 2.
+        seed (int | None): The seed to use for random number generation.
+        top_p (float | None): An alternative to sampling with temperature, called nucleus sampling.
+        max_retries (int): How many times to retry rate-limited or failed requests with exponential
+            backoff. Defaults to 6.
+
+    Returns:
+        str: The message content.
+    """
+    client = _get_openai_client(base_url, api_key_variable, max_retries)
+    completion_kwargs = _completion_kwargs(
+        max_completion_tokens=max_completion_tokens,
+        max_tokens=max_tokens,
+        reasoning_effort=reasoning_effort,
+        temperature=temperature,
+        seed=seed,
+        top_p=top_p,
+    )
+    response = client.chat.completions.create(
+        model=model,
+        messages=messages,
         stream=False,
         **completion_kwargs,
     )
-    return response.to_dict()
+    return response.choices[0].message.content
+
+
+async def openai_chat_completion_batch(
+    model: str,
+    messages_list: list[list[dict[str, str | dict[str, str]]]],
+    base_url: str = "https://api.openai.com/v1",
+    api_key_variable: str = "OPENAI_API_KEY",
+    max_completion_tokens: int | None = None,
+    max_tokens: int | None = None,
+    reasoning_effort: Literal["none", "low", "medium", "high"] | None = None,
+    temperature: float | None = None,
+    seed: int | None = None,
+    top_p: float | None = None,
+    max_concurrency: int = 16,
+) -> list[dict[str, Any]]:
+    """
+    Make a batch of chat completion requests to OpenAI concurrently.
+
+    Up to `max_concurrency` requests are in flight at once over a single shared
+    client, so the batch takes roughly as long as its slowest requests instead of
+    the sum of all requests.
+
+    Args:
+        model (str): The OpenAI model to use.
+        messages_list (list[list[dict[str, str | dict[str, str]]]]): One list of messages per request.
+        base_url (str, optional): The base URL for the OpenAI API. Defaults to "https://api.openai.com/v1".
+        api_key_variable (str, optional): The environment variable containing the API key. Defaults to "OPENAI_API_KEY".
+        max_completion_tokens (int | None): An upper bound for the number of tokens that can be generated for a completion.
+        max_tokens (int | None): The maximum number of tokens that can be generated in the chat completion.
+        reasoning_effort (Literal["none", "low", "medium", "high"] | None): Constrains effort on reasoning for reasoning models.
+        temperature (float | None): What sampling temperature to use, between 0 and 2.
+        seed (int | None): The seed to use for random number generation.
+        top_p (float | None): An alternative to sampling with temperature, called nucleus sampling.
+        max_concurrency (int): The maximum number of requests in flight at the same time. Defaults to 16.
+
+    Returns:
+        list[dict[str, Any]]: The OpenAI responses, in the same order as `messages_list`.
+    """
+    AsyncOpenAI = _async_openai_class()
+    api_key = _get_api_key(api_key_variable)
+
+    completion_kwargs = _completion_kwargs(
+        max_completion_tokens=max_completion_tokens,
+        max_tokens=max_tokens,
+        reasoning_effort=reasoning_effort,
+        temperature=temperature,
+        seed=seed,
+        top_p=top_p,
+    )
+
+    # Bound the number of concurrent requests to stay within rate limits
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def create(client, messages):
+        async with semaphore:
+            return await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                stream=False,
+                **completion_kwargs,
+            )
+
+    # Async clients are bound to the event loop they run on, so one client is shared
+    # by the whole batch instead of being cached across calls like `_get_openai_client`
+    async with AsyncOpenAI(base_url=base_url, api_key=api_key) as client:
+        responses = await asyncio.gather(
+            *(create(client, messages) for messages in messages_list)
+        )
+    return [response.to_dict() for response in responses]
+
+
+def openai_batch_completion(
+    model: str,
+    messages_list: list[list[dict[str, str | dict[str, str]]]],
+    base_url: str = "https://api.openai.com/v1",
+    api_key_variable: str = "OPENAI_API_KEY",
+    max_completion_tokens: int | None = None,
+    temperature: float | None = None,
+    seed: int | None = None,
+    poll_interval: float = 30,
+) -> list[dict[str, Any]]:
+    """
+    Run a large set of chat completions through the OpenAI Batch API.
+
+    The requests are uploaded as a single batch job which OpenAI processes
+    asynchronously at a discounted price, within a 24 hour completion window.
+    This node blocks until the job has finished, so it is meant for offline
+    workloads rather than interactive use.
+
+    Args:
+        model (str): The OpenAI model to use.
+        messages_list (list[list[dict[str, str | dict[str, str]]]]): One list of messages per request.
+        base_url (str, optional): The base URL for the OpenAI API. Defaults to "https://api.openai.com/v1".
+        api_key_variable (str, optional): The environment variable containing the API key. Defaults to "OPENAI_API_KEY".
+        max_completion_tokens (int | None): An upper bound for the number of tokens that can be generated for a completion.
+        temperature (float | None): What sampling temperature to use, between 0 and 2.
+        seed (int | None): The seed to use for random number generation.
+        poll_interval (float): How often to check the status of the batch job, in seconds. Defaults to 30.
+
+    Returns:
+        list[dict[str, Any]]: The OpenAI responses, in the same order as `messages_list`. A request
+            that failed is returned as a dict with an `error` key instead.
+    """
+    client = _get_openai_client(base_url, api_key_variable)
+
+    completion_kwargs = _completion_kwargs(
+        max_completion_tokens=max_completion_tokens,
+        temperature=temperature,
+        seed=seed,
+    )
+
+    batch_input = b"\n".join(
+        _dumps_json(
+            {
+                "custom_id": str(index),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": model, "messages": messages, **completion_kwargs},
+            }
+        )
+        for index, messages in enumerate(messages_list)
+    )
+    input_file = client.files.create(
+        file=("batch_input.jsonl", batch_input), purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+
+    try:
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+    except BaseException:
+        # Don't leave a billed job running when polling fails or is interrupted
+        with suppress(Exception):
+            client.batches.cancel(batch.id)
+        raise
+    if batch.status != "completed":
+        raise RuntimeError(
+            f"OpenAI batch {batch.id} ended with status '{batch.status}'"
+        )
+
+    # Results come back in arbitrary order, so they are matched to requests by custom_id
+    results = [None] * len(messages_list)
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line:
+                continue
+            record = _loads_json(line)
+            response = record.get("response")
+            if response and response.get("status_code") == 200:
+                results[int(record["custom_id"])] = response["body"]
+            else:
+                error = record.get("error") or (response or {}).get("body")
+                results[int(record["custom_id"])] = {"error": error}
+    return results
 
 
 def litellm_chat_completion(
@@ -103,9 +520,7 @@ def litellm_chat_completion(
     logprobs: bool = False,
     base_url: str | None = None,
 ) -> dict[str, Any]:
-    from litellm import completion
-
-    response = completion(
+    response = _litellm_completion()(
         model=model,
         messages=messages,
         stream=False,
@@ -118,7 +533,8 @@ def litellm_chat_completion(
         logprobs=logprobs,
         base_url=base_url,
     )
-    return response.to_dict()
+    # Skip fields litellm never populated instead of walking the full pydantic schema
+    return response.model_dump(mode="python", exclude_unset=True)
 
 
 def get_message_content(response: dict[str, Any]) -> str:
@@ -159,10 +575,17 @@ class OpenAIChatCompletionStream:
         temperature: float | None = None,
         seed: int | None = None,
         top_p: float | None = None,
+        flush_interval_ms: int = 20,
+        flush_chunk_size: int = 16,
+        max_retries: int = 6,
     ) -> dict[str, Any]:
         """
         Make a streaming chat completion request to OpenAI.
 
+        Incoming chunks are buffered and emitted together, either every
+        `flush_interval_ms` milliseconds or every `flush_chunk_size` chunks, whichever
+        comes first.
+
         Args:
             model (str): The OpenAI model to use.
             messages (list[dict[str, str | dict[str, str]]]): The messages to send to the model.
@@ -174,82 +597,94 @@ class OpenAIChatCompletionStream:
             temperature (float | None): What sampling temperature to use, between 0 and 2.
             seed (int | None): The seed to use for random number generation.
             top_p (float | None): An alternative to sampling with temperature, called nucleus sampling.
+            flush_interval_ms (int): The maximum time to buffer chunks before emitting them. Defaults to 20.
+            flush_chunk_size (int): The maximum number of chunks to buffer before emitting them. Defaults to 16.
+            max_retries (int): How many times to retry rate-limited or failed requests with exponential
+                backoff. Defaults to 6.
 
         Returns:
             dict[str, Any]: The OpenAI response with the complete message content.
         """
-        from openai import OpenAI
-
-        api_key = os.getenv(api_key_variable)
-        if not api_key:
-            raise ValueError(
-                f"Environment variable '{api_key_variable}' is not set. "
-                f"Please set it before running this function."
-            )
-        client = OpenAI(base_url=base_url, api_key=api_key)
-
-        completion_kwargs = {}
-        if max_completion_tokens:
-            completion_kwargs["max_completion_tokens"] = max_completion_tokens
-        if max_tokens:
-            completion_kwargs["max_tokens"] = max_tokens
-        if reasoning_effort:
-            completion_kwargs["reasoning_effort"] = reasoning_effort
-        if temperature is not None:
-            completion_kwargs["temperature"] = temperature
-        if seed:
-            completion_kwargs["seed"] = seed
-        if top_p is not None:
-            completion_kwargs["top_p"] = top_p
-
-        # Make streaming request with stream_options to get usage stats
-        stream = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            stream=True,
-            stream_options={"include_usage": True},
-            **completion_kwargs,
+        client = _get_openai_client(base_url, api_key_variable, max_retries)
+
+        completion_kwargs = _completion_kwargs(
+            max_completion_tokens=max_completion_tokens,
+            max_tokens=max_tokens,
+            reasoning_effort=reasoning_effort,
+            temperature=temperature,
+            seed=seed,
+            top_p=top_p,
         )
 
         # Accumulate the response
-        accumulated_content = []
-        response_id = None
-        response_model = None
-        created = None
+        accumulated_content = io.StringIO()
+        response_id = response_model = created = None
         finish_reason = None
         usage = None
+        pending = []
+        # Bind the stream callback once; nothing is buffered when no one is listening
+        emit = (
+            self._stream_reporter.emit if self._stream_reporter.has_callback else None
+        )
+        last_flush = time.monotonic()
 
-        for chunk in stream:
-            # Capture metadata from first chunk
-            if response_id is None and chunk.id:
-                response_id = chunk.id
-            if response_model is None and chunk.model:
-                response_model = chunk.model
-            if created is None and chunk.created:
-                created = chunk.created
-
-            # Process choices
-            if chunk.choices:
-                for choice in chunk.choices:
-                    if choice.delta and choice.delta.content:
-                        content = choice.delta.content
-                        accumulated_content.append(content)
-                        # Emit the chunk through the stream reporter
-                        self._stream_reporter.emit(content)
-
-                    if choice.finish_reason:
-                        finish_reason = choice.finish_reason
-
-            # Capture usage from the final chunk
-            if chunk.usage:
-                usage = {
-                    "prompt_tokens": chunk.usage.prompt_tokens,
-                    "completion_tokens": chunk.usage.completion_tokens,
-                    "total_tokens": chunk.usage.total_tokens,
-                }
+        # Make streaming request with stream_options to get usage stats. The raw
+        # server-sent events are decoded by hand, which skips building an SDK model
+        # object for every chunk.
+        with client.chat.completions.with_streaming_response.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **completion_kwargs,
+        ) as raw_response:
+            for chunk in _iter_sse_chunks(raw_response):
+                # Record the metadata from the first chunk that carries it. Some
+                # endpoints (e.g. Azure OpenAI) lead with a prompt-filter chunk whose
+                # id, model and created are empty, so those count as missing.
+                if response_id is None:
+                    response_id = chunk.get("id") or None
+                if response_model is None:
+                    response_model = chunk.get("model") or None
+                if created is None:
+                    created = chunk.get("created") or None
+
+                # Process choices
+                for choice in chunk.get("choices") or ():
+                    if (delta := choice.get("delta")) and (
+                        content := delta.get("content")
+                    ):
+                        accumulated_content.write(content)
+                        if emit is not None:
+                            pending.append(content)
+
+                    if chunk_finish_reason := choice.get("finish_reason"):
+                        finish_reason = chunk_finish_reason
+
+                # Capture usage from the final chunk
+                if (chunk_usage := chunk.get("usage")) is not None:
+                    usage = {
+                        "prompt_tokens": chunk_usage.get("prompt_tokens"),
+                        "completion_tokens": chunk_usage.get("completion_tokens"),
+                        "total_tokens": chunk_usage.get("total_tokens"),
+                    }
+
+                # Emit buffered chunks through the stream reporter
+                if pending:
+                    now = time.monotonic()
+                    if (
+                        len(pending) >= flush_chunk_size
+                        or (now - last_flush) * 1000 >= flush_interval_ms
+                    ):
+                        emit("".join(pending))
+                        pending.clear()
+                        last_flush = now
+
+        if pending:
+            emit("".join(pending))
 
         # Construct the final response dict matching non-streaming format
-        full_content = "".join(accumulated_content)
+        full_content = accumulated_content.getvalue()
 
         response = {
             "id": response_id,
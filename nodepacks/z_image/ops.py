@@ -1,3 +1,8 @@
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Literal
 
 import torch
@@ -9,8 +14,9 @@ from diffusers import (
     ZImageTransformer2DModel,
     logging as diffusers_logging,
 )
+from diffusers.hooks import apply_group_offloading
 from diffusers.image_processor import VaeImageProcessor
-from diffusers.utils.torch_utils import randn_tensor
+from PIL import Image
 from transformers import AutoTokenizer, PreTrainedTokenizerBase
 from transformers.models.qwen3.modeling_qwen3 import Qwen3Model
 from transformers.utils import logging as transformers_logging
@@ -18,6 +24,126 @@ from transformers.utils import logging as transformers_logging
 from psynapse_backend.schema_extractor import AnnotatedDict
 from psynapse_backend.stateful_op_utils import ProgressReporter
 
+# FlashAttention kernels are used for the text encoder and the diffusion transformer
+# when the optional `flash-attn` package is installed; otherwise both fall back to
+# PyTorch's scaled dot-product attention
+_FLASH_ATTENTION_AVAILABLE = importlib.util.find_spec("flash_attn") is not None
+
+
+def _place_on_device(
+    model: torch.nn.Module,
+    device: str,
+    offload: Literal["model", "group", "none"],
+) -> tuple[torch.nn.Module, UserCpuOffloadHook | None]:
+    """Place a model on `device` according to the requested offload strategy.
+
+    Only the "model" strategy returns a hook; with the other strategies nothing needs
+    to be offloaded explicitly after the model has run.
+    """
+    if offload == "none":
+        return model.to(device), None
+    if offload == "group":
+        # Stream the weights in one block at a time, prefetching the next block on a
+        # separate CUDA stream while the current one computes
+        apply_group_offloading(
+            model,
+            onload_device=torch.device(device),
+            offload_device=torch.device("cpu"),
+            offload_type="block_level",
+            num_blocks_per_group=1,
+            use_stream=True,
+            record_stream=True,
+        )
+        return model, None
+    return cpu_offload_with_hook(model, execution_device=device)
+
+
+def _compile_transformer_blocks(model: torch.nn.Module) -> None:
+    """Compile the repeated blocks of a transformer with `torch.compile`.
+
+    Compiling the blocks rather than the whole model keeps compile times short, and
+    stays compatible with the offload hooks that wrap the model's top-level forward.
+    """
+    if getattr(model, "_repeated_blocks", None):
+        model.compile_repeated_blocks(fullgraph=False, dynamic=False)
+        return
+    for module in model.modules():
+        if isinstance(module, torch.nn.ModuleList):
+            for block in module:
+                block.compile(fullgraph=False, dynamic=False)
+
+
+# Pretrained weights are kept in memory, so re-running a workflow skips reading the
+# checkpoints from disk again. Only the most recently used arguments are kept per
+# loader, so switching model, device or offload replaces the loaded copy instead of
+# holding several multi-GB copies at once.
+@lru_cache(maxsize=1)
+def _load_tokenizer(model_name: str, subfolder: str) -> PreTrainedTokenizerBase:
+    # A replaced tokenizer or text encoder may reuse the id of the old one, which
+    # the prompt embeddings cache is keyed by
+    _clear_prompt_embeddings_cache()
+    return AutoTokenizer.from_pretrained(model_name, subfolder=subfolder)
+
+
+@lru_cache(maxsize=1)
+def _load_text_encoder(
+    model_name: str,
+    subfolder: str,
+    device: str,
+    offload: Literal["model", "group", "none"],
+) -> tuple[Qwen3Model, UserCpuOffloadHook | None]:
+    _clear_prompt_embeddings_cache()
+    transformers_logging.set_verbosity_info()
+    model = Qwen3Model.from_pretrained(
+        model_name,
+        subfolder=subfolder,
+        dtype=torch.bfloat16,
+        attn_implementation="flash_attention_2"
+        if _FLASH_ATTENTION_AVAILABLE
+        else "sdpa",
+    )
+    return _place_on_device(model, device, offload)
+
+
+@lru_cache(maxsize=1)
+def _load_diffusion_transformer(
+    model_name: str,
+    subfolder: str,
+    device: str,
+    offload: Literal["model", "group", "none"],
+    compile_blocks: bool,
+) -> tuple[ZImageTransformer2DModel, UserCpuOffloadHook | None]:
+    diffusers_logging.set_verbosity_info()
+    model = ZImageTransformer2DModel.from_pretrained(
+        model_name,
+        subfolder=subfolder,
+        torch_dtype=torch.bfloat16,
+    )
+    if _FLASH_ATTENTION_AVAILABLE and hasattr(model, "set_attention_backend"):
+        model.set_attention_backend("flash")
+    model, hook = _place_on_device(model, device, offload)
+    if compile_blocks:
+        _compile_transformer_blocks(model)
+    return model, hook
+
+
+@lru_cache(maxsize=1)
+def _load_vae(
+    model_name: str,
+    subfolder: str,
+    device: str,
+    offload: Literal["model", "group", "none"],
+) -> tuple[AutoencoderKL, UserCpuOffloadHook | None]:
+    diffusers_logging.set_verbosity_info()
+    model = AutoencoderKL.from_pretrained(
+        model_name,
+        subfolder=subfolder,
+        torch_dtype=torch.bfloat16,
+    )
+    # The VAE decoder is convolutional, and its convolutions run faster in channels-last
+    model = model.to(memory_format=torch.channels_last)
+    return _place_on_device(model, device, offload)
+
 
 def load_tokenizer(
     model_name: str = "Tongyi-MAI/Z-Image-Turbo", subfolder: str = "tokenizer"
@@ -31,13 +157,14 @@ def load_tokenizer(
     Returns:
         A tokenizer instance.
     """
-    return AutoTokenizer.from_pretrained(model_name, subfolder=subfolder)
+    return _load_tokenizer(model_name, subfolder)
 
 
 def load_text_encoder(
     model_name: str = "Tongyi-MAI/Z-Image-Turbo",
     subfolder: str = "text_encoder",
     device: str = "cuda:0",
+    offload: Literal["model", "group", "none"] = "model",
 ) -> AnnotatedDict[Literal["text_encoder_model", "text_encoder_hook"]]:
     """Load a text encoder from a pretrained model.
 
@@ -45,17 +172,15 @@ def load_text_encoder(
         model_name: The name or path of the pretrained model.
         subfolder: The name of the text encoder subfolder in the Hugging Face model repository.
         device: The execution device for the model
+        offload: How to manage the model's memory. "model" moves the whole model to `device`
+            when it runs and back to the CPU afterwards, "group" streams the weights to
+            `device` block by block while it runs (lowest memory use), and "none" keeps the
+            model on `device` between runs (fastest).
 
     Returns:
         A dictionary with 2 keys: 'text_encoder_model' and 'text_encoder_hook'
     """
-    transformers_logging.set_verbosity_info()
-    model = Qwen3Model.from_pretrained(
-        model_name,
-        subfolder=subfolder,
-        dtype=torch.bfloat16,
-    )
-    model, hook = cpu_offload_with_hook(model, execution_device=device)
+    model, hook = _load_text_encoder(model_name, subfolder, device, offload)
     return {"text_encoder_model": model, "text_encoder_hook": hook}
 
 
@@ -96,25 +221,32 @@ def load_diffusion_transformer(
     model_name: str = "Tongyi-MAI/Z-Image-Turbo",
     subfolder: str = "transformer",
     device: str = "cuda:0",
+    offload: Literal["model", "group", "none"] = "model",
 ) -> AnnotatedDict[Literal["dit_model", "dit_hook", "num_channels_latents"]]:
     """
     Load a diffusion transformer from a pretrained model repository.
 
+    Set the `PSYNAPSE_COMPILE_DIT` environment variable to "1" to compile the transformer
+    blocks with `torch.compile`. The first run at each resolution is slower while the
+    blocks compile, and later runs are faster. The variable is read on every call, so it
+    can also be set through a run's environment variables; changing it reloads the model.
+
     Args:
         model_name: The name or path of the pretrained model.
         subfolder: The name of the diffusion transformer subfolder in the Hugging Face model repository.
         device: The execution device for the model
+        offload: How to manage the model's memory. "model" moves the whole model to `device`
+            when it runs and back to the CPU afterwards, "group" streams the weights to
+            `device` block by block while it runs (lowest memory use), and "none" keeps the
+            model on `device` between runs (fastest).
 
     Returns:
         A dictionary with 3 keys: 'dit_model', 'dit_hook', and 'num_channels_latents'
     """
-    diffusers_logging.set_verbosity_info()
-    model = ZImageTransformer2DModel.from_pretrained(
-        model_name,
-        subfolder=subfolder,
-        torch_dtype=torch.bfloat16,
+    compile_blocks = os.getenv("PSYNAPSE_COMPILE_DIT", "0") == "1"
+    model, hook = _load_diffusion_transformer(
+        model_name, subfolder, device, offload, compile_blocks
     )
-    model, hook = cpu_offload_with_hook(model, execution_device=device)
     return {
         "dit_model": model,
         "dit_hook": hook,
@@ -126,6 +258,8 @@ def load_vae(
     model_name: str = "Tongyi-MAI/Z-Image-Turbo",
     subfolder: str = "vae",
     device: str = "cuda:0",
+    offload: Literal["model", "group", "none"] = "model",
+    tiled_decode: bool = True,
 ) -> AnnotatedDict[
     Literal["vae_model", "vae_hook", "vae_scale_factor", "vae_image_processor"]
 ]:
@@ -136,17 +270,25 @@ def load_vae(
         model_name: The name or path of the pretrained model.
         subfolder: The name of the VAE subfolder in the Hugging Face model repository.
         device: The execution device for the model
+        offload: How to manage the model's memory. "model" moves the whole model to `device`
+            when it runs and back to the CPU afterwards, "group" streams the weights to
+            `device` block by block while it runs (lowest memory use), and "none" keeps the
+            model on `device` between runs (fastest).
+        tiled_decode: Whether to decode large images in overlapping tiles and batches one
+            image at a time, which keeps peak memory low at high resolutions.
 
     Returns:
         A dictionary with 4 keys: 'vae_model', 'vae_hook', 'vae_scale_factor', and 'vae_image_processor'
     """
-    diffusers_logging.set_verbosity_info()
-    model = AutoencoderKL.from_pretrained(
-        model_name,
-        subfolder=subfolder,
-        torch_dtype=torch.bfloat16,
-    )
-    model, hook = cpu_offload_with_hook(model, execution_device=device)
+    model, hook = _load_vae(model_name, subfolder, device, offload)
+    # Tiling and slicing are flags on the model, so they are set on the cached instance
+    # rather than loading a separate copy for each setting
+    if tiled_decode:
+        model.enable_tiling()
+        model.enable_slicing()
+    else:
+        model.disable_tiling()
+        model.disable_slicing()
     vae_scale_factor = 2 ** (len(model.config.block_out_channels) - 1)
     image_processor = VaeImageProcessor(vae_scale_factor=vae_scale_factor * 2)
     return {
@@ -157,66 +299,157 @@ def load_vae(
     }
 
 
+# Recently computed prompt embeddings, kept in host memory so that re-running a
+# workflow with an unchanged prompt skips tokenization and the text encoder
+PROMPT_EMBEDDINGS_CACHE_SIZE = 32
+_prompt_embeddings_cache = OrderedDict()
+_prompt_embeddings_cache_lock = threading.Lock()
+
+
+def _clear_prompt_embeddings_cache() -> None:
+    with _prompt_embeddings_cache_lock:
+        _prompt_embeddings_cache.clear()
+
+
 @torch.no_grad()
 def encode_prompt(
-    prompt: str,
+    prompt: str | list[str],
     tokenizer: PreTrainedTokenizerBase,
     text_encoder: Qwen3Model,
-    text_encoder_hook: UserCpuOffloadHook,
+    text_encoder_hook: UserCpuOffloadHook | None,
     max_sequence_length: int = 512,
     device: str = "cuda:0",
 ) -> list[torch.Tensor]:
     """
-    Encodes a prompt into a list of embeddings.
+    Encodes a prompt, or a batch of prompts, into a list of embeddings.
+
+    The embeddings of the most recently encoded prompts are cached, so encoding the same
+    prompt again with the same tokenizer and text encoder skips the model entirely.
 
     Args:
-        prompt: The prompt to encode.
+        prompt: The prompt to encode, or a list of prompts to encode in a single batch.
         tokenizer: The tokenizer to use for encoding.
         text_encoder: The text encoder to use for encoding.
         text_encoder_hook: The hook to use for offloading the text encoder.
-        max_sequence_length: The maximum sequence length for the tokenizer.
+        max_sequence_length: The maximum sequence length for the tokenizer. Prompts are only
+            padded to the longest prompt in the batch, and truncated to this length.
         device: The device to run the model on.
 
     Returns:
-        A list of embeddings.
+        A list of embeddings, one per prompt.
     """
-    prompt = [prompt]
-    for i, prompt_item in enumerate(prompt):
-        messages = [{"role": "user", "content": prompt_item}]
-        prompt_item = tokenizer.apply_chat_template(
-            messages,
-            tokenize=False,
-            add_generation_prompt=True,
-            enable_thinking=True,
-        )
-        prompt[i] = prompt_item
+    prompt = [prompt] if isinstance(prompt, str) else prompt
+    cache_key = (tuple(prompt), max_sequence_length, id(tokenizer), id(text_encoder))
+    with _prompt_embeddings_cache_lock:
+        cached_embeddings = _prompt_embeddings_cache.get(cache_key)
+        if cached_embeddings is not None:
+            _prompt_embeddings_cache.move_to_end(cache_key)
+    if cached_embeddings is not None:
+        return [
+            embeddings.to(device, non_blocking=True) for embeddings in cached_embeddings
+        ]
+
+    prompt = tokenizer.apply_chat_template(
+        [[{"role": "user", "content": prompt_item}] for prompt_item in prompt],
+        tokenize=False,
+        add_generation_prompt=True,
+        enable_thinking=True,
+    )
     text_inputs = tokenizer(
         prompt,
-        padding="max_length",
+        padding="longest",
         max_length=max_sequence_length,
         truncation=True,
         return_tensors="pt",
     )
-    text_input_ids = text_inputs.input_ids.to(device)
-    prompt_masks = text_inputs.attention_mask.to(device).bool()
-    prompt_embeddings = text_encoder(
-        input_ids=text_input_ids,
-        attention_mask=prompt_masks,
-        output_hidden_states=True,
-    ).hidden_states[-2]
-    embeddings_list = [
-        prompt_embeddings[i][prompt_masks[i]] for i in range(len(prompt_embeddings))
-    ]
-    text_encoder_hook.offload()
+    input_ids, attention_mask = text_inputs.input_ids, text_inputs.attention_mask
+    if torch.cuda.is_available():
+        # Copy from pinned host memory so the transfers don't block the host
+        input_ids, attention_mask = input_ids.pin_memory(), attention_mask.pin_memory()
+    text_input_ids = input_ids.to(device, non_blocking=True)
+    prompt_masks = attention_mask.to(device, non_blocking=True).bool()
+    # Only the penultimate layer's output is needed, so capture it with a forward hook
+    # instead of having the model keep the hidden states of every layer
+    captured = []
+    handle = text_encoder.layers[-2].register_forward_hook(
+        lambda module, inputs, output: captured.append(
+            output[0] if isinstance(output, tuple) else output
+        )
+    )
+    try:
+        text_encoder(input_ids=text_input_ids, attention_mask=prompt_masks)
+    finally:
+        handle.remove()
+    prompt_embeddings = captured[0]
+    # Gather the unpadded tokens of the whole batch at once, then split per prompt
+    embeddings_list = list(
+        prompt_embeddings[prompt_masks].split(attention_mask.sum(dim=1).tolist())
+    )
+    if text_encoder_hook is not None:
+        text_encoder_hook.offload()
+
+    host_embeddings = [embeddings.to("cpu") for embeddings in embeddings_list]
+    if torch.cuda.is_available():
+        # Pinned host memory allows the copy back to the device to run asynchronously
+        host_embeddings = [embeddings.pin_memory() for embeddings in host_embeddings]
+    with _prompt_embeddings_cache_lock:
+        _prompt_embeddings_cache[cache_key] = host_embeddings
+        if len(_prompt_embeddings_cache) > PROMPT_EMBEDDINGS_CACHE_SIZE:
+            _prompt_embeddings_cache.popitem(last=False)
     return embeddings_list
 
 
+def encode_prompt_with_negative(
+    prompt: str | list[str],
+    negative_prompt: str | list[str],
+    tokenizer: PreTrainedTokenizerBase,
+    text_encoder: Qwen3Model,
+    text_encoder_hook: UserCpuOffloadHook | None,
+    max_sequence_length: int = 512,
+    device: str = "cuda:0",
+) -> AnnotatedDict[Literal["prompt_embeddings", "negative_prompt_embeddings"]]:
+    """
+    Encodes a prompt and a negative prompt for classifier-free guidance in a single batch,
+    so the text encoder runs (and is onloaded) only once for both.
+
+    Args:
+        prompt: The prompt to encode, or a list of prompts.
+        negative_prompt: The negative prompt to encode, or a list of negative prompts.
+        tokenizer: The tokenizer to use for encoding.
+        text_encoder: The text encoder to use for encoding.
+        text_encoder_hook: The hook to use for offloading the text encoder.
+        max_sequence_length: The maximum sequence length for the tokenizer.
+        device: The device to run the model on.
+
+    Returns:
+        A dictionary with 2 keys: 'prompt_embeddings' and 'negative_prompt_embeddings'
+    """
+    prompt = [prompt] if isinstance(prompt, str) else prompt
+    negative_prompt = (
+        [negative_prompt] if isinstance(negative_prompt, str) else negative_prompt
+    )
+    embeddings = encode_prompt(
+        prompt + negative_prompt,
+        tokenizer,
+        text_encoder,
+        text_encoder_hook,
+        max_sequence_length=max_sequence_length,
+        device=device,
+    )
+    return {
+        "prompt_embeddings": embeddings[: len(prompt)],
+        "negative_prompt_embeddings": embeddings[len(prompt) :],
+    }
+
+
 @torch.no_grad()
 def initialize_random_latents(
     height: int,
     width: int,
     vae_scale_factor: int,
     num_channels_latents: int,
+    batch_size: int = 1,
+    seed: int | None = None,
     device: str = "cuda:0",
 ) -> AnnotatedDict[Literal["latents", "image_seq_len"]]:
     """
@@ -226,6 +459,9 @@ def initialize_random_latents(
         height: The height of the image.
         width: The width of the image.
         vae_scale_factor: The scale factor of the VAE.
+        num_channels_latents: The number of latent channels of the diffusion transformer.
+        batch_size: The number of images to generate.
+        seed: The seed for the random number generator. A random seed is used if not set.
         device: The device to run the model on.
 
     Returns:
@@ -233,8 +469,15 @@ def initialize_random_latents(
     """
     height = 2 * (int(height) // (vae_scale_factor * 2))
     width = 2 * (int(width) // (vae_scale_factor * 2))
-    shape = (1, num_channels_latents, height, width)
-    latents = randn_tensor(shape, device=device, dtype=torch.bfloat16)
+    generator = None
+    if seed is not None:
+        generator = torch.Generator(device=device).manual_seed(seed)
+    # Sample the noise in place on the target device
+    latents = torch.empty(
+        (batch_size, num_channels_latents, height, width),
+        device=device,
+        dtype=torch.bfloat16,
+    ).normal_(generator=generator)
     image_seq_len = (latents.shape[2] // 2) * (latents.shape[3] // 2)
     return {
         "latents": latents,
@@ -269,6 +512,22 @@ def calculate_timestep_shift(
     return timestep_shift
 
 
+def _prefetch_offloaded_model(
+    hook: UserCpuOffloadHook | None,
+) -> torch.cuda.Stream | None:
+    """Start moving an offloaded model to its execution device on a side CUDA stream.
+
+    The copy overlaps with the work already queued on the current stream; the caller
+    must make the current stream wait on the returned stream before using the model.
+    """
+    if hook is None or not torch.cuda.is_available():
+        return None
+    stream = torch.cuda.Stream()
+    with torch.cuda.stream(stream):
+        hook.model.to(hook.hook.execution_device, non_blocking=True)
+    return stream
+
+
 class DenoisingDiffusion:
     def __init__(self):
         self._progress_reporter = ProgressReporter()
@@ -281,11 +540,14 @@ class DenoisingDiffusion:
         scheduler: FlowMatchEulerDiscreteScheduler,
         timesteps: torch.Tensor,
         transformer: ZImageTransformer2DModel,
-        transformer_hook: UserCpuOffloadHook,
+        transformer_hook: UserCpuOffloadHook | None,
         guidance_scale: float = 0.0,
         cfg_normalization: bool = False,
         cfg_truncation: float = 1.0,
         negative_prompt_embeddings: list[torch.Tensor] | None = None,
+        cache_interval: int = 1,
+        cache_warmup_steps: int = 1,
+        prefetch_vae_hook: UserCpuOffloadHook | None = None,
     ) -> AnnotatedDict[Literal["denoised_latents"]]:
         """
         The core denoising loop that iteratively removes noise from the latents.
@@ -304,6 +566,13 @@ class DenoisingDiffusion:
                 for normalized time values > cfg_truncation.
             negative_prompt_embeddings: List of negative prompt embeddings
                 (required if guidance_scale > 1).
+            cache_interval: Run the transformer only every `cache_interval` steps after
+                the warmup steps, and reuse the previous prediction in between. Trades
+                some quality for speed; 1 runs the transformer at every step.
+            cache_warmup_steps: The number of initial steps that always run the transformer.
+            prefetch_vae_hook: The offload hook of the VAE that decodes the result. When
+                given, the VAE is copied to the device during the last step, so decoding
+                does not have to wait for it.
 
         Returns:
             A dictionary with 'denoised_latents' key containing the denoised latent tensor.
@@ -317,93 +586,144 @@ class DenoisingDiffusion:
                     "negative_prompt_embeddings is required when guidance_scale > 1"
                 )
 
+        cfg_renormalization = float(cfg_normalization) if cfg_normalization else 0.0
+
+        # The transformer input is allocated once and refilled at every step. It has
+        # room for the negative batch when CFG is enabled, plus a temporal dimension
+        # (for video compatibility in the model), and the per-sample views handed to
+        # the transformer stay valid across steps.
+        num_model_inputs = (
+            2 * actual_batch_size if do_classifier_free_guidance else actual_batch_size
+        )
+        latent_model_input = torch.empty(
+            (num_model_inputs, latents.shape[1], 1, *latents.shape[2:]),
+            device=latents.device,
+            dtype=transformer.dtype,
+        )
+        latent_model_input_views = list(latent_model_input.unbind(dim=0))
+        # Likewise, the transformer outputs are gathered (and upcast) into a single fp32
+        # buffer at every step, and the guided prediction is written into its own buffer
+        model_outputs = torch.empty(
+            (num_model_inputs, *latents.shape[1:]),
+            device=latents.device,
+            dtype=torch.float32,
+        )
+        model_output_views = list(model_outputs.unbind(dim=0))
+        if do_classifier_free_guidance:
+            guided_noise_pred = torch.empty_like(model_outputs[:actual_batch_size])
+
+        # The prompt embeddings and timesteps do not change across steps, so the CFG
+        # prompt batch is built and the timesteps are normalized to [0, 1] up front
+        if do_classifier_free_guidance:
+            cfg_prompt_embeddings = prompt_embeddings + negative_prompt_embeddings
+        normalized_timesteps = (1000 - timesteps) / 1000
+        # Decide up front which steps run CFG: truncation disables it for normalized
+        # times above `cfg_truncation`, and those steps only run the positive batch.
+        # The normalized times are read back to the host once for this, so the loop
+        # does not synchronize with the device at every step.
+        truncate_cfg = cfg_truncation is not None and cfg_truncation <= 1
+        cfg_active = [
+            do_classifier_free_guidance
+            and not (truncate_cfg and t_norm > cfg_truncation)
+            for t_norm in normalized_timesteps.tolist()
+        ]
+
+        cache_interval = max(1, cache_interval)
+        cached_noise_pred = None
+        prefetch_stream = None
         total_steps = len(timesteps)
         for i, t in enumerate(timesteps):
-            # Expand timestep to batch dimension
-            timestep = t.expand(latents.shape[0])
-            # Normalize timestep to [0, 1] range
-            timestep = (1000 - timestep) / 1000
-            # Get normalized time for cfg truncation check
-            t_norm = timestep[0].item()
-
-            # Handle cfg truncation
-            current_guidance_scale = guidance_scale
-            if (
-                do_classifier_free_guidance
-                and cfg_truncation is not None
-                and cfg_truncation <= 1
-            ):
-                if t_norm > cfg_truncation:
-                    current_guidance_scale = 0.0
-
-            # Run CFG only if configured AND scale is non-zero
-            apply_cfg = do_classifier_free_guidance and current_guidance_scale > 0
-
-            if apply_cfg:
-                latents_typed = latents.to(transformer.dtype)
-                latent_model_input = latents_typed.repeat(2, 1, 1, 1)
-                prompt_embeds_model_input = (
-                    prompt_embeddings + negative_prompt_embeddings
-                )
-                timestep_model_input = timestep.repeat(2)
-            else:
-                latent_model_input = latents.to(transformer.dtype)
-                prompt_embeds_model_input = prompt_embeddings
-                timestep_model_input = timestep
-
-            # Add temporal dimension (for video compatibility in the model)
-            latent_model_input = latent_model_input.unsqueeze(2)
-            latent_model_input_list = list(latent_model_input.unbind(dim=0))
-
-            # Forward pass through transformer
-            model_out_list = transformer(
-                latent_model_input_list,
-                timestep_model_input,
-                prompt_embeds_model_input,
-                return_dict=False,
-            )[0]
-
-            if apply_cfg:
-                # Perform CFG
-                pos_out = model_out_list[:actual_batch_size]
-                neg_out = model_out_list[actual_batch_size:]
-
-                noise_pred = []
-                for j in range(actual_batch_size):
-                    pos = pos_out[j].float()
-                    neg = neg_out[j].float()
-
-                    pred = pos + current_guidance_scale * (pos - neg)
-
-                    # Renormalization
-                    if cfg_normalization and float(cfg_normalization) > 0.0:
-                        ori_pos_norm = torch.linalg.vector_norm(pos)
-                        new_pos_norm = torch.linalg.vector_norm(pred)
-                        max_new_norm = ori_pos_norm * float(cfg_normalization)
-                        if new_pos_norm > max_new_norm:
-                            pred = pred * (max_new_norm / new_pos_norm)
-
-                    noise_pred.append(pred)
-
-                noise_pred = torch.stack(noise_pred, dim=0)
+            # Reuse the previous step's prediction on cached steps instead of running
+            # the transformer again
+            reuse_cached_prediction = (
+                cached_noise_pred is not None
+                and i >= cache_warmup_steps
+                and (i - cache_warmup_steps) % cache_interval != 0
+            )
+            if reuse_cached_prediction:
+                noise_pred = cached_noise_pred
             else:
-                noise_pred = torch.stack([out.float() for out in model_out_list], dim=0)
-
-            # Remove temporal dimension
-            noise_pred = noise_pred.squeeze(2)
-            # Negate the noise prediction (model predicts velocity / negative noise)
-            noise_pred = -noise_pred
-
-            # Compute the previous noisy sample x_t -> x_t-1
-            latents = scheduler.step(
-                noise_pred.to(torch.float32), t, latents, return_dict=False
-            )[0]
+                normalized_timestep = normalized_timesteps[i]
+                apply_cfg = cfg_active[i]
+
+                # Copy (and cast) the latents into the preallocated model input
+                latent_model_input[:actual_batch_size, :, 0].copy_(latents)
+                if apply_cfg:
+                    latent_model_input[actual_batch_size:, :, 0].copy_(latents)
+                    latent_model_input_list = latent_model_input_views
+                    prompt_embeds_model_input = cfg_prompt_embeddings
+                    # Expand timestep to the positive and negative batch
+                    timestep_model_input = normalized_timestep.expand(
+                        2 * actual_batch_size
+                    )
+                else:
+                    latent_model_input_list = latent_model_input_views[
+                        :actual_batch_size
+                    ]
+                    prompt_embeds_model_input = prompt_embeddings
+                    # Expand timestep to batch dimension
+                    timestep_model_input = normalized_timestep.expand(actual_batch_size)
+
+                # Forward pass through transformer
+                model_out_list = transformer(
+                    latent_model_input_list,
+                    timestep_model_input,
+                    prompt_embeds_model_input,
+                    return_dict=False,
+                )[0]
+
+                # Remove the temporal dimension while copying into the output buffer
+                for model_output_view, model_out in zip(
+                    model_output_views, model_out_list
+                ):
+                    model_output_view.copy_(model_out.squeeze(1))
+                pos = model_outputs[:actual_batch_size]
+
+                if apply_cfg:
+                    # Perform CFG over the whole batch at once
+                    neg = model_outputs[actual_batch_size:]
+                    noise_pred = torch.sub(pos, neg, out=guided_noise_pred)
+                    noise_pred.mul_(guidance_scale).add_(pos)
+
+                    # Renormalization, capping each sample's norm without a host sync
+                    if cfg_renormalization > 0.0:
+                        norm_dims = tuple(range(1, pos.ndim))
+                        ori_pos_norm = torch.linalg.vector_norm(
+                            pos, dim=norm_dims, keepdim=True
+                        )
+                        new_pos_norm = torch.linalg.vector_norm(
+                            noise_pred, dim=norm_dims, keepdim=True
+                        )
+                        max_new_norm = ori_pos_norm * cfg_renormalization
+                        noise_pred.mul_(
+                            torch.where(
+                                new_pos_norm > max_new_norm,
+                                max_new_norm / new_pos_norm,
+                                torch.ones_like(new_pos_norm),
+                            )
+                        )
+                else:
+                    noise_pred = pos
+
+                # Negate the noise prediction (model predicts velocity / negative noise)
+                noise_pred.neg_()
+                cached_noise_pred = noise_pred
+
+            if i == total_steps - 1:
+                prefetch_stream = _prefetch_offloaded_model(prefetch_vae_hook)
+
+            # Compute the previous noisy sample x_t -> x_t-1. The prediction is already
+            # in fp32, which keeps the latents in fp32 across steps
+            latents = scheduler.step(noise_pred, t, latents, return_dict=False)[0]
 
             self._progress_reporter.update(
                 i + 1, total_steps, f"Denoising step {i + 1}/{total_steps}"
             )
 
-        transformer_hook.offload()
+        if prefetch_stream is not None:
+            torch.cuda.current_stream().wait_stream(prefetch_stream)
+        if transformer_hook is not None:
+            transformer_hook.offload()
         return {"denoised_latents": latents}
 
 
@@ -411,7 +731,7 @@ class DenoisingDiffusion:
 def decode_latents(
     latents: torch.Tensor,
     vae: AutoencoderKL,
-    vae_hook: UserCpuOffloadHook,
+    vae_hook: UserCpuOffloadHook | None,
     image_processor: VaeImageProcessor,
 ) -> list:
     """
@@ -426,15 +746,22 @@ def decode_latents(
     Returns:
         A list of PIL images.
     """
-    latents = latents.to(vae.dtype)
+    latents = latents.to(vae.dtype, memory_format=torch.channels_last)
     # Apply scaling and shift factors from VAE config
     latents = (latents / vae.config.scaling_factor) + vae.config.shift_factor
 
     # Decode latents to image
     image = vae.decode(latents, return_dict=False)[0]
 
-    # Post-process to PIL images
-    images = image_processor.postprocess(image, output_type="pil")
-
-    vae_hook.offload()
+    # Post-process on the device, equivalently to `image_processor.postprocess`, so
+    # only the 8-bit HWC pixels are copied back to the host
+    image = image.float()
+    if image_processor.config.do_normalize:
+        image = image / 2 + 0.5
+    pixels = image.clamp_(0, 1).mul_(255).round_().to(torch.uint8)
+    pixels = pixels.permute(0, 2, 3, 1).cpu().numpy()
+    images = [Image.fromarray(pixel_array) for pixel_array in pixels]
+
+    if vae_hook is not None:
+        vae_hook.offload()
     return images
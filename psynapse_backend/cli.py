@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import typer
+
+# Typer CLI. The server module (FastAPI, Pydantic, PIL and the graph executor) is only
+# imported once a command actually runs, so `--help` and shell completion stay fast.
+# Help and errors are rendered by click and Python directly, without importing rich.
+cli = typer.Typer(
+    help="Psynapse Backend CLI",
+    rich_markup_mode=None,
+    pretty_exceptions_enable=False,
+)
+
+
+@cli.command()
+def run(
+    host: str = typer.Option("0.0.0.0", help="Host to bind the server to"),
+    port: int = typer.Option(8000, help="Port to bind the server to"),
+    reload: bool = typer.Option(False, help="Enable auto-reload for development"),
+    nodepack_dir: str = typer.Option(
+        str(Path(__file__).parent.parent / "nodepacks"),
+        help="Directory containing nodepacks",
+    ),
+):
+    """
+    Start the Psynapse backend server.
+    """
+    import uvicorn
+
+    from psynapse_backend.main import set_nodepacks_dir
+
+    # Set the nodepacks directory before starting the server
+    set_nodepacks_dir(nodepack_dir)
+
+    uvicorn.run(
+        "psynapse_backend.main:app",
+        host=host,
+        port=port,
+        reload=reload,
+    )
+
+
+if __name__ == "__main__":
+    cli()
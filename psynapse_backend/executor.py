@@ -1,10 +1,19 @@
+import asyncio
 import importlib.util
 import inspect
+import json
 import os
 import queue
 import threading
-from collections import defaultdict, deque
-from typing import Any
+from collections import OrderedDict, defaultdict, deque
+from pathlib import Path
+from typing import Any, get_origin, get_type_hints
+
+from psynapse_backend.pure_op_utils import is_pure
+
+# Maximum number of pure function results kept by a GraphExecutor
+PURE_RESULT_CACHE_SIZE = 4096
+SCHEDULE_CACHE_SIZE = 64
 
 
 def _extract_output_value(
@@ -49,6 +58,64 @@ def _extract_output_value(
     )
 
 
+def _resolve_result(result: Any) -> Any:
+    """
+    Resolve the return value of a node call.
+
+    Nodes may be implemented as coroutine functions (e.g. an `async def __call__`).
+    Calling them returns a coroutine, which is run to completion on a fresh event
+    loop in the executing thread.
+
+    Args:
+        result: The value returned by calling the node.
+
+    Returns:
+        The awaited result for coroutines, otherwise the result unchanged.
+    """
+    if inspect.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+def _convert_inputs(
+    inputs: dict[str, Any], type_hints: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    Convert node inputs to the types expected by the callable's type hints.
+
+    Scalar values (e.g. numbers entered as text) are cast to `float`, `int`, `str`
+    or `bool`. A single dict wired into a `list[...]` parameter, such as one LLM
+    message connected to a `messages` input, is wrapped into a one-element list so
+    node functions always receive the declared container type.
+
+    Args:
+        inputs: The gathered inputs of the node.
+        type_hints: The type hints of the callable.
+
+    Returns:
+        The converted inputs.
+    """
+    converted_inputs = {}
+    for param_name, value in inputs.items():
+        if param_name in type_hints:
+            param_type = type_hints[param_name]
+            if param_type == float and not isinstance(value, float):
+                converted_inputs[param_name] = float(value)
+            elif param_type == int and not isinstance(value, (int, bool)):
+                converted_inputs[param_name] = int(value)
+            elif param_type == str and not isinstance(value, str):
+                converted_inputs[param_name] = str(value)
+            elif param_type == bool and not isinstance(value, bool):
+                converted_inputs[param_name] = bool(value)
+            elif get_origin(param_type) is list and isinstance(value, dict):
+                converted_inputs[param_name] = [value]
+            else:
+                converted_inputs[param_name] = value
+        else:
+            converted_inputs[param_name] = value
+    return converted_inputs
+
+
 class GraphExecutor:
     """
     GraphExecutor is responsible for executing the node graph.
@@ -56,25 +123,35 @@ class GraphExecutor:
 
     Args:
         nodepacks_dir: The directory containing the nodepacks.
+        memoize_pure_functions: Whether to cache results of functions marked with `@pure`.
+            Defaults to the `PSYNAPSE_MEMOIZE_OPS` environment variable, which enables
+            caching only when set to "1".
 
     Attributes:
         nodepacks_dir: The directory containing the nodepacks.
+        memoize_pure_functions: Whether results of pure functions are cached.
         function_registry: A dictionary of functions from the nodepacks.
         progress_class_registry: A dictionary of progress classes from the nodepacks.
         stream_class_registry: A dictionary of stream classes from the nodepacks.
     """
 
-    def __init__(self, nodepacks_dir: str):
+    def __init__(self, nodepacks_dir: str, memoize_pure_functions: bool | None = None):
         self.nodepacks_dir = nodepacks_dir
+        if memoize_pure_functions is None:
+            memoize_pure_functions = os.getenv("PSYNAPSE_MEMOIZE_OPS", "0") == "1"
+        self.memoize_pure_functions = memoize_pure_functions
         self.function_registry = {}
         self.progress_class_registry = {}
         self.stream_class_registry = {}
+        self._callable_specs = {}
+        self._pure_results = OrderedDict()
+        self._pure_results_lock = threading.Lock()
+        self._schedules = OrderedDict()
+        self._schedules_lock = threading.Lock()
         self._load_functions()
 
     def _load_functions(self):
         """Load all functions, progress classes, and stream classes from nodepacks into registries."""
-        from pathlib import Path
-
         nodepacks_path = Path(self.nodepacks_dir)
         if not nodepacks_path.exists():
             return
@@ -130,7 +207,12 @@ class GraphExecutor:
             spec.loader.exec_module(module)
 
             for name, obj in inspect.getmembers(module):
-                if inspect.isfunction(obj) and obj.__module__ == module.__name__:
+                # Load public functions (skip private helpers)
+                if (
+                    inspect.isfunction(obj)
+                    and obj.__module__ == module.__name__
+                    and not name.startswith("_")
+                ):
                     self.function_registry[name] = obj
                 # Also load classes with __call__ method
                 elif (
@@ -200,11 +282,100 @@ class GraphExecutor:
         except Exception as e:
             print(f"Error loading stream classes from {filepath}: {e}")
 
+    def _get_callable_spec(
+        self, function_name: str
+    ) -> tuple[list[str], dict[str, Any]]:
+        """
+        Get the parameter names and type hints of a registered function or class.
+
+        Inspecting signatures and resolving type hints is relatively expensive, so the
+        result is computed once per function name and reused across node executions.
+
+        Args:
+            function_name: The name of the registered function, progress class, or stream class.
+
+        Returns:
+            A tuple of the parameter names and the type hints of the callable.
+        """
+        spec = self._callable_specs.get(function_name)
+        if spec is not None:
+            return spec
+
+        if function_name in self.progress_class_registry:
+            target = self.progress_class_registry[function_name].__call__
+            sig = inspect.signature(target)
+            param_names = [p for p in sig.parameters.keys() if p != "self"]
+        elif function_name in self.stream_class_registry:
+            target = self.stream_class_registry[function_name].__call__
+            sig = inspect.signature(target)
+            param_names = [p for p in sig.parameters.keys() if p != "self"]
+        else:
+            target = self.function_registry[function_name]
+            sig = inspect.signature(target)
+            param_names = list(sig.parameters.keys())
+
+        try:
+            type_hints = get_type_hints(target)
+        except Exception:
+            type_hints = {}
+
+        spec = (param_names, type_hints)
+        self._callable_specs[function_name] = spec
+        return spec
+
+    def _call_function(
+        self, function_name: str, func: Any, inputs: dict[str, Any]
+    ) -> Any:
+        """
+        Call a node function, reusing cached results for pure functions.
+
+        Results of functions marked with `@pure` are cached by function name and
+        inputs, so re-executing a graph whose inputs did not change skips the
+        computation. Calls with unhashable inputs are never cached.
+
+        Args:
+            function_name: The name of the registered function.
+            func: The function to call.
+            inputs: The keyword arguments to call the function with.
+
+        Returns:
+            The result of the function call.
+        """
+        if not self.memoize_pure_functions or not is_pure(func):
+            return _resolve_result(func(**inputs))
+
+        try:
+            key = (
+                function_name,
+                tuple(
+                    (name, type(value), value) for name, value in sorted(inputs.items())
+                ),
+            )
+            hash(key)
+        except TypeError:
+            return _resolve_result(func(**inputs))
+
+        with self._pure_results_lock:
+            if key in self._pure_results:
+                self._pure_results.move_to_end(key)
+                return self._pure_results[key]
+
+        result = _resolve_result(func(**inputs))
+
+        with self._pure_results_lock:
+            self._pure_results[key] = result
+            if len(self._pure_results) > PURE_RESULT_CACHE_SIZE:
+                self._pure_results.popitem(last=False)
+        return result
+
     def topological_sort(self, nodes: list[dict], edges: list[dict]) -> list[str]:
         """
         Perform topological sort using Kahn's algorithm.
         Returns list of node IDs in execution order.
 
+        The order only depends on the graph's structure, so it is cached per set of node
+        IDs and edges; re-running a graph whose values changed reuses the cached order.
+
         Args:
             nodes: The nodes of the graph.
             edges: The edges of the graph.
@@ -212,6 +383,16 @@ class GraphExecutor:
         Returns:
             A list of node IDs in execution order.
         """
+        structure_key = (
+            tuple(node["id"] for node in nodes),
+            tuple((edge["source"], edge["target"]) for edge in edges),
+        )
+        with self._schedules_lock:
+            sorted_nodes = self._schedules.get(structure_key)
+            if sorted_nodes is not None:
+                self._schedules.move_to_end(structure_key)
+                return list(sorted_nodes)
+
         # Build adjacency list and in-degree map
         graph = defaultdict(list)
         in_degree = defaultdict(int)
@@ -222,10 +403,13 @@ class GraphExecutor:
             if node_id not in in_degree:
                 in_degree[node_id] = 0
 
-        # Build graph from edges
+        # Build graph from edges, skipping edges left dangling by a removed node so
+        # they neither block their target nor schedule a node that does not exist
         for edge in edges:
             source = edge["source"]
             target = edge["target"]
+            if source not in in_degree or target not in in_degree:
+                continue
             graph[source].append(target)
             in_degree[target] += 1
 
@@ -247,6 +431,10 @@ class GraphExecutor:
         if len(sorted_nodes) != len(nodes):
             raise ValueError("Graph contains a cycle")
 
+        with self._schedules_lock:
+            self._schedules[structure_key] = tuple(sorted_nodes)
+            if len(self._schedules) > SCHEDULE_CACHE_SIZE:
+                self._schedules.popitem(last=False)
         return sorted_nodes
 
     def execute_graph(
@@ -266,6 +454,10 @@ class GraphExecutor:
         Returns:
             A dictionary of node IDs and their results.
         """
+        # Only ViewNode results are returned, so a graph without any has nothing to run
+        if not any(node.get("type") == "viewNode" for node in nodes):
+            return {}
+
         # Store original environment variables
         original_env = {}
         if env_vars:
@@ -360,8 +552,6 @@ class GraphExecutor:
                             node_outputs[node_id] = variable_value
                         elif isinstance(variable_value, str):
                             try:
-                                import json
-
                                 node_outputs[node_id] = json.loads(variable_value)
                             except json.JSONDecodeError:
                                 node_outputs[node_id] = {}
@@ -453,16 +643,11 @@ class GraphExecutor:
                     # Get the callable and parameter names
                     if is_progress_node:
                         callable_cls = self.progress_class_registry[function_name]
-                        sig = inspect.signature(callable_cls.__call__)
-                        param_names = [p for p in sig.parameters.keys() if p != "self"]
                     elif is_stream_node:
                         callable_cls = self.stream_class_registry[function_name]
-                        sig = inspect.signature(callable_cls.__call__)
-                        param_names = [p for p in sig.parameters.keys() if p != "self"]
                     else:
                         func = self.function_registry[function_name]
-                        sig = inspect.signature(func)
-                        param_names = list(sig.parameters.keys())
+                    param_names, type_hints = self._get_callable_spec(function_name)
 
                     # Gather inputs
                     node_data = node.get("data", {})
@@ -490,44 +675,16 @@ class GraphExecutor:
                     # Execute function or class
                     try:
                         # Convert string inputs to appropriate types if needed
-                        type_hints = {}
-                        try:
-                            from typing import get_type_hints
-
-                            if is_progress_node:
-                                type_hints = get_type_hints(callable_cls.__call__)
-                            elif is_stream_node:
-                                type_hints = get_type_hints(callable_cls.__call__)
-                            else:
-                                type_hints = get_type_hints(func)
-                        except:
-                            pass
-
-                        converted_inputs = {}
-                        for param_name, value in inputs.items():
-                            if param_name in type_hints:
-                                param_type = type_hints[param_name]
-                                if param_type == float and not isinstance(value, float):
-                                    converted_inputs[param_name] = float(value)
-                                elif param_type == int and not isinstance(
-                                    value, (int, bool)
-                                ):
-                                    converted_inputs[param_name] = int(value)
-                                elif param_type == str and not isinstance(value, str):
-                                    converted_inputs[param_name] = str(value)
-                                elif param_type == bool and not isinstance(value, bool):
-                                    converted_inputs[param_name] = bool(value)
-                                else:
-                                    converted_inputs[param_name] = value
-                            else:
-                                converted_inputs[param_name] = value
+                        converted_inputs = _convert_inputs(inputs, type_hints)
 
                         if is_progress_node or is_stream_node:
                             # Instantiate class and call it
                             instance = callable_cls()
-                            result = instance(**converted_inputs)
+                            result = _resolve_result(instance(**converted_inputs))
                         else:
-                            result = func(**converted_inputs)
+                            result = self._call_function(
+                                function_name, func, converted_inputs
+                            )
                         node_outputs[node_id] = result
 
                     except Exception as e:
@@ -699,8 +856,6 @@ class GraphExecutor:
                             output = variable_value
                         elif isinstance(variable_value, str):
                             try:
-                                import json
-
                                 output = json.loads(variable_value)
                             except json.JSONDecodeError:
                                 output = {}
@@ -842,20 +997,11 @@ class GraphExecutor:
                     # Get the callable (function or class)
                     if is_progress_node:
                         progress_class = self.progress_class_registry[function_name]
-                        # Get signature from __call__ method
-                        sig = inspect.signature(progress_class.__call__)
-                        # Filter out 'self' parameter
-                        param_names = [p for p in sig.parameters.keys() if p != "self"]
                     elif is_stream_node:
                         stream_class = self.stream_class_registry[function_name]
-                        # Get signature from __call__ method
-                        sig = inspect.signature(stream_class.__call__)
-                        # Filter out 'self' parameter
-                        param_names = [p for p in sig.parameters.keys() if p != "self"]
                     else:
                         func = self.function_registry[function_name]
-                        sig = inspect.signature(func)
-                        param_names = list(sig.parameters.keys())
+                    param_names, type_hints = self._get_callable_spec(function_name)
 
                     # Gather inputs
                     node_data = node.get("data", {})
@@ -892,37 +1038,7 @@ class GraphExecutor:
                     # Execute function, progress class, or stream class
                     try:
                         # Convert string inputs to appropriate types if needed
-                        type_hints = {}
-                        try:
-                            from typing import get_type_hints
-
-                            if is_progress_node:
-                                type_hints = get_type_hints(progress_class.__call__)
-                            elif is_stream_node:
-                                type_hints = get_type_hints(stream_class.__call__)
-                            else:
-                                type_hints = get_type_hints(func)
-                        except:
-                            pass
-
-                        converted_inputs = {}
-                        for param_name, value in inputs.items():
-                            if param_name in type_hints:
-                                param_type = type_hints[param_name]
-                                if param_type == float and not isinstance(value, float):
-                                    converted_inputs[param_name] = float(value)
-                                elif param_type == int and not isinstance(
-                                    value, (int, bool)
-                                ):
-                                    converted_inputs[param_name] = int(value)
-                                elif param_type == str and not isinstance(value, str):
-                                    converted_inputs[param_name] = str(value)
-                                elif param_type == bool and not isinstance(value, bool):
-                                    converted_inputs[param_name] = bool(value)
-                                else:
-                                    converted_inputs[param_name] = value
-                            else:
-                                converted_inputs[param_name] = value
+                        converted_inputs = _convert_inputs(inputs, type_hints)
 
                         if is_progress_node:
                             # Execute progress node with threading and progress updates
@@ -956,7 +1072,9 @@ class GraphExecutor:
                             # Execute in a separate thread
                             def execute_with_progress():
                                 try:
-                                    result = instance(**converted_inputs)
+                                    result = _resolve_result(
+                                        instance(**converted_inputs)
+                                    )
                                     result_container.append(result)
                                 except Exception as e:
                                     error_container.append(e)
@@ -1042,7 +1160,9 @@ class GraphExecutor:
                             # Execute in a separate thread
                             def execute_with_stream():
                                 try:
-                                    result = instance(**converted_inputs)
+                                    result = _resolve_result(
+                                        instance(**converted_inputs)
+                                    )
                                     result_container.append(result)
                                 except Exception as e:
                                     error_container.append(e)
@@ -1098,7 +1218,9 @@ class GraphExecutor:
                                 }
                         else:
                             # Execute regular function
-                            result = func(**converted_inputs)
+                            result = self._call_function(
+                                function_name, func, converted_inputs
+                            )
                             node_outputs[node_id] = result
 
                             # Yield completed status
@@ -4,7 +4,6 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
-import typer
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
@@ -215,35 +214,7 @@ def execute_graph_stream(request: ExecuteRequest):
     )
 
 
-# Typer CLI
-cli = typer.Typer(help="Psynapse Backend CLI")
-
-
-@cli.command()
-def run(
-    host: str = typer.Option("0.0.0.0", help="Host to bind the server to"),
-    port: int = typer.Option(8000, help="Port to bind the server to"),
-    reload: bool = typer.Option(False, help="Enable auto-reload for development"),
-    nodepack_dir: str = typer.Option(
-        str(Path(__file__).parent.parent / "nodepacks"),
-        help="Directory containing nodepacks",
-    ),
-):
-    """
-    Start the Psynapse backend server.
-    """
-    import uvicorn
-
-    # Set the nodepacks directory before starting the server
-    set_nodepacks_dir(nodepack_dir)
-
-    uvicorn.run(
-        "psynapse_backend.main:app",
-        host=host,
-        port=port,
-        reload=reload,
-    )
-
-
 if __name__ == "__main__":
+    from psynapse_backend.cli import cli
+
     cli()
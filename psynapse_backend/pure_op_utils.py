@@ -0,0 +1,20 @@
+from typing import Callable, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+
+def pure(func: F) -> F:
+    """
+    Mark a nodepack function as pure.
+
+    A pure function has no side effects and always returns the same output for the
+    same inputs, so the executor can reuse a previously computed result instead of
+    calling it again.
+    """
+    func.is_pure = True
+    return func
+
+
+def is_pure(func: Callable) -> bool:
+    """Check whether a function has been marked as pure."""
+    return getattr(func, "is_pure", False)
@@ -316,7 +316,11 @@ def extract_schemas_from_file(
                         schemas.append(schema)
             else:
                 # Extract functions
-                if inspect.isfunction(obj) and obj.__module__ == module.__name__:
+                if (
+                    inspect.isfunction(obj)
+                    and obj.__module__ == module.__name__
+                    and not name.startswith("_")  # Skip private functions
+                ):
                     schema = extract_function_schema(obj, filepath)
                     if schema:
                         schemas.append(schema)
@@ -33,6 +33,11 @@ class StreamReporter:
         """Set the callback for stream updates."""
         self._callback = callback
 
+    @property
+    def has_callback(self) -> bool:
+        """Whether a callback is listening for stream updates."""
+        return self._callback is not None
+
     def emit(self, chunk: str):
         """Emit a text chunk to the stream."""
         if self._callback and chunk:
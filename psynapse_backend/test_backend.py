@@ -112,6 +112,73 @@ def test_complex_graph():
     print(f"✓ Complex graph executed correctly: (5+3) * (2+4) = {results['view']}")
 
 
+def test_dangling_and_duplicate_edges():
+    """Test that edges to missing nodes and repeated edges don't break execution"""
+    print("\nTesting dangling and duplicate edges...")
+
+    executor = GraphExecutor("../nodepacks")
+
+    nodes = [
+        {
+            "id": "add",
+            "type": "functionNode",
+            "data": {"functionName": "add", "a": 1, "b": 2},
+        },
+        {"id": "view", "type": "viewNode", "data": {}},
+    ]
+    edge = {
+        "source": "add",
+        "target": "view",
+        "sourceHandle": "output",
+        "targetHandle": "input",
+    }
+    edges = [
+        edge,
+        dict(edge),
+        {"source": "deleted", "target": "add", "targetHandle": "a"},
+        {"source": "add", "target": "deleted", "targetHandle": "input"},
+    ]
+
+    results = executor.execute_graph(nodes, edges)
+
+    assert results == {"view": 3}, f"Unexpected results: {results}"
+
+    print(f"✓ Graph with stale edges executed correctly: add(1, 2) = {results['view']}")
+
+
+def test_pure_function_cache():
+    """Test that pure function results are reused across executions"""
+    print("\nTesting pure function result cache...")
+
+    executor = GraphExecutor("../nodepacks", memoize_pure_functions=True)
+
+    nodes = [
+        {
+            "id": "sqrt",
+            "type": "functionNode",
+            "data": {"functionName": "sqrt", "a": 16},
+        },
+        {"id": "view", "type": "viewNode", "data": {}},
+    ]
+    edges = [
+        {
+            "source": "sqrt",
+            "target": "view",
+            "sourceHandle": "output",
+            "targetHandle": "input",
+        }
+    ]
+
+    first = executor.execute_graph(nodes, edges)
+    assert len(executor._pure_results) == 1, "Pure result was not cached"
+    second = executor.execute_graph(nodes, edges)
+
+    assert first == second == {"view": 4.0}, f"Unexpected results: {first}, {second}"
+    assert len(executor._pure_results) == 1, "Cached pure result was not reused"
+
+    print(f"✓ Pure function result reused: sqrt(16) = {second['view']}")
+
+
 if __name__ == "__main__":
     print("=" * 50)
     print("Running Psynapse Backend Tests")
@@ -121,6 +188,8 @@ if __name__ == "__main__":
         test_schema_extraction()
         test_graph_execution()
         test_complex_graph()
+        test_dangling_and_duplicate_edges()
+        test_pure_function_cache()
 
         print("\n" + "=" * 50)
         print("✓ All tests passed!")
@@ -16,8 +16,8 @@ def pil_image_to_openai_string(image: Image.Image, format: str = "PNG") -> str:
     """
     buffered = BytesIO()
     image.save(buffered, format=format)
-    img_bytes = buffered.getvalue()
-    img_base64 = base64.b64encode(img_bytes).decode("utf-8")
+    # Encode straight from the buffer's memory instead of copying it out with getvalue()
+    img_base64 = base64.b64encode(buffered.getbuffer()).decode("ascii")
     mime_type = f"image/{format.lower()}"
     return f"data:{mime_type};base64,{img_base64}"
 
@@ -33,7 +33,7 @@ def openai_string_to_pil_image(image_str: str) -> Image.Image:
     """
     # Remove the data URL prefix if present
     if image_str.startswith("data:"):
-        image_str = image_str.split(",", 1)[1]
+        image_str = image_str.partition(",")[2]
 
     img_bytes = base64.b64decode(image_str)
     return Image.open(BytesIO(img_bytes))